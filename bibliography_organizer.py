@@ -1,79 +1,328 @@
+import array
+import atexit
+import hashlib
+import io
 import os
+import queue
+import re
 import shutil
+import sqlite3
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-import PyPDF2
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import logging
-from typing import Dict, List, Tuple
+from logging.handlers import QueueHandler, QueueListener
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+# orjson parses and serializes JSON several times faster than the stdlib;
+# fall back transparently when it is not installed. orjson.JSONDecodeError
+# subclasses json.JSONDecodeError, so the existing except clauses cover both.
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+def _setup_logger() -> logging.Logger:
+    """Return the shared logger, installing the queue handler on first use.
+
+    Logging goes through a queue so worker threads never contend on the file
+    handler; a background listener drains to disk.
+    """
+    logger = logging.getLogger(__name__)
+    logger.setLevel(logging.INFO)
+    if not logger.handlers:
+        log_queue = queue.Queue(-1)
+        file_handler = logging.FileHandler('bibliography_organizer.log', encoding='utf-8')
+        file_handler.setFormatter(logging.Formatter(
+            '%(asctime)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        ))
+        logger.addHandler(QueueHandler(log_queue))
+        listener = QueueListener(log_queue, file_handler)
+        listener.start()
+        atexit.register(listener.stop)
+    return logger
+
+def _iter_json_objects(text: str):
+    """Yield (object, raw substring) for every valid JSON object embedded in text.
+
+    Uses json.JSONDecoder.raw_decode so the scanning happens in C instead of
+    a Python-level brace-matching loop.
+    """
+    decoder = json.JSONDecoder()
+    i = 0
+    n = len(text)
+    while i < n:
+        i = text.find('{', i)
+        if i == -1:
+            return
+        try:
+            obj, end = decoder.raw_decode(text, i)
+            yield obj, text[i:end]
+            i = end
+        except json.JSONDecodeError:
+            i += 1
+
 
 class BibliographyOrganizer:
+    # Precomputed table for sanitize_filename: spaces become underscores and
+    # every other character outside [A-Za-z0-9._-] is dropped, all in one
+    # C-level str.translate pass
+    _SANITIZE_TABLE = str.maketrans(' ', '_', ''.join(
+        c for c in map(chr, range(128))
+        if c != ' ' and not (c.isalnum() or c in '._-')))
+
+    # Filename shapes that already carry the metadata unambiguously; files
+    # matching one of these never need an API call
+    _FILENAME_PATTERNS = [
+        # Smith (1999) - Some Title
+        re.compile(r'^(?P<author>[A-Z][a-z]+)\s*\(\s*\d{4}\s*\)\s*[-_]\s*(?P<title>.+)$'),
+        # Smith_1999_Some_Title
+        re.compile(r'^(?P<author>[A-Z][a-z]+)[-_]\d{4}[-_](?P<title>[A-Za-z0-9_ .\-]{5,})$'),
+        # Smith-SomeTitle
+        re.compile(r'^(?P<author>[A-Z][a-z]+)[-_](?P<title>[A-Za-z0-9_ ]{5,})$'),
+    ]
+
+    # Stable prompt prefixes with baked-in examples: the model re-derives the
+    # output format less often (fewer malformed JSON responses to recover
+    # from) and providers that cache prompt prefixes can reuse them across
+    # calls. Only the variable suffix is appended per request.
+    _METADATA_PROMPT_PREFIX = (
+        "I will give you a filename of a file which is an academic work. "
+        "Use the data in the filename to look in the web for the full title "
+        "of the academic work and its author's surname, and find out if it "
+        "is an article or a book. Respond with ONE JSON object with the keys "
+        "title, author (the author's surname) and document_type (article or "
+        "book). No markdown, no code blocks, no other text. Use empty "
+        "strings if you can't determine both values clearly.\n"
+        "Examples:\n"
+        "Input: Knuth-ArtOfComputerProgramming-Vol1.pdf\n"
+        '{"title": "The Art of Computer Programming, Volume 1", "author": "Knuth", "document_type": "book"}\n'
+        "Input: Shannon_1948_Mathematical_Theory_of_Communication.pdf\n"
+        '{"title": "A Mathematical Theory of Communication", "author": "Shannon", "document_type": "article"}\n'
+        "Input: scan0042.pdf\n"
+        '{"title": "", "author": "", "document_type": ""}\n'
+        "Input: ")
+
+    _BATCH_PROMPT_PREFIX = (
+        "I will give you a numbered list of filenames of academic works. For "
+        "each one, use the data in the filename to look in the web for the "
+        "full title of the academic work and its author's surname, and find "
+        "out if it is an article or a book. Respond with ONE JSON object "
+        "with a single property 'results' containing an array of objects, "
+        "one per filename, each with the keys id (the number of the "
+        "filename), title, author (the author's surname) and document_type "
+        "(article or book). No markdown, no code blocks, no other text. Use "
+        "empty strings if you can't determine both values clearly.\n"
+        "Example:\n"
+        "1: Knuth-ArtOfComputerProgramming-Vol1.pdf\n"
+        "2: scan0042.pdf\n"
+        '{"results": [{"id": 1, "title": "The Art of Computer Programming, Volume 1", '
+        '"author": "Knuth", "document_type": "book"}, '
+        '{"id": 2, "title": "", "author": "", "document_type": ""}]}\n'
+        "Filenames:\n")
+
+    _PLAN_PROMPT_PREFIX = (
+        "I will give you a list of academic works. Based on it, create a "
+        "simple organization scheme that best fits these works. Respond with "
+        "ONE JSON object with a single property 'placements' that maps each "
+        "work entry exactly as given to its designated folder path. Folder "
+        "paths use forward slashes and can be nested. No markdown, no code "
+        "blocks, no other text.\n"
+        "Example:\n"
+        "Works to organize:\n"
+        "Quantum Theory by Einstein\n"
+        "Linear Algebra by Gauss\n"
+        # The trailing ellipsis is deliberate: this prompt is logged in full,
+        # and find_last_placement_json scans the log for valid placements
+        # JSON when resuming, so the example must never parse as one
+        '{"placements": {"Quantum Theory by Einstein": "Science/Physics", '
+        '"Linear Algebra by Gauss": "Mathematics/Algebra", ...}}\n'
+        "Works to organize:\n")
+
     def __init__(self, api_key: str):
         self.api_key = api_key
         self.api_url = "https://openrouter.ai/api/v1/chat/completions"
-        self.headers = {
+        # One pooled session keeps the TLS connection alive across calls
+        # instead of paying the TCP+TLS handshake on every request.
+        self.session = requests.Session()
+        self.session.headers.update({
             "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        # Set up logging
-        logging.basicConfig(
-            filename='bibliography_organizer.log',
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        self.logger = logging.getLogger(__name__)
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://bibliography-organizer.local",
+            "X-Title": "Bibliography Organizer"
+        })
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            # POST must be allowed explicitly, it is excluded from urllib3's
+            # default retryable methods; safe here since 429/5xx responses
+            # mean no completion was returned
+            max_retries=Retry(total=3, backoff_factor=0.3,
+                              status_forcelist=[429, 500, 502, 503, 504],
+                              allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {'POST'})
+        ))
+        self.logger = _setup_logger()
+        self.max_workers = 16
+        self.batch_size = 20
+        self.cache_file = 'bibliography_cache.json'
         self.metadata_cache = {}
+        self._cache_lock = threading.Lock()
+        self._pdf_cache = {}
         self._build_metadata_cache()
+        # Persistent prompt -> response cache so identical prompts across
+        # runs never re-hit the API. One connection shared across the worker
+        # threads, serialized by a lock.
+        self._prompt_cache = sqlite3.connect('prompt_cache.sqlite3', check_same_thread=False)
+        self._prompt_cache.execute('CREATE TABLE IF NOT EXISTS c (k BLOB PRIMARY KEY, v TEXT)')
+        self._prompt_cache_lock = threading.Lock()
 
     def _build_metadata_cache(self):
-        """Parse the log file to build a cache of processed filenames and their metadata."""
-        log_file = 'bibliography_organizer.log'
-        if not os.path.exists(log_file):
+        """Load the persisted metadata cache from the sidecar JSON file."""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                entries = _json_loads(f.read())
+        except FileNotFoundError:
+            self.metadata_cache = {}
+            return
+        except (json.JSONDecodeError, ValueError):
+            self.logger.error(f"Corrupt cache file {self.cache_file}, starting with an empty cache")
+            self.metadata_cache = {}
             return
 
-        encodings = ['utf-8', 'latin-1', 'cp1252']
-        for encoding in encodings:
+        # Normalize legacy raw-filename keys to sanitized form; when
+        # duplicates collapse, prefer whichever entry has metadata
+        cache = {}
+        for key, value in entries.items():
+            key = self.sanitize_filename(key)
+            value = tuple(value)
+            if key not in cache or (not any(cache[key]) and any(value)):
+                cache[key] = value
+        self.metadata_cache = cache
+
+    def _persist_cache(self):
+        """Atomically write the metadata cache to the sidecar JSON file."""
+        tmp_file = self.cache_file + '.tmp'
+        # Workers on the thread pools call this concurrently, so the whole
+        # tmp-write + replace must happen under the lock or parallel persists
+        # race on the shared tmp file and corrupt the cache
+        with self._cache_lock:
             try:
-                with open(log_file, 'r', encoding=encoding) as f:
-                    lines = f.readlines()
-                break
-            except UnicodeDecodeError:
-                if encoding == encodings[-1]:
-                    self.logger.error(f"Failed to read log file with encodings: {encodings}")
-                    return
-                continue
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    f.write(_json_dumps(self.metadata_cache))
+                os.replace(tmp_file, self.cache_file)
+            except OSError as e:
+                self.logger.error(f"Failed to persist metadata cache: {str(e)}")
+
+    def migrate_cache_from_log(self) -> int:
+        """One-shot migration: parse the legacy log file into the JSON cache.
+
+        Returns the number of entries added. Kept only so existing users can
+        upgrade once via the --migrate-log flag; new runs persist the cache
+        directly.
+        """
+        log_file = 'bibliography_organizer.log'
+        if not os.path.exists(log_file):
+            return 0
 
+        # Sidecar offset index: remember how far previous migrations got so
+        # repeated runs only parse log bytes written since then
+        idx_file = log_file + '.idx'
+        log_size = os.path.getsize(log_file)
+        last_indexed = 0
+        try:
+            with open(idx_file, 'rb') as f:
+                offsets = array.array('q')
+                offsets.frombytes(f.read(offsets.itemsize))
+                # A zero-byte index (crash mid-write) decodes to an empty array
+                last_indexed = offsets[0] if offsets else 0
+        except (OSError, ValueError):
+            last_indexed = 0
+        if last_indexed > log_size:
+            # Log was truncated or rotated; reparse from the start
+            last_indexed = 0
+        if last_indexed == log_size:
+            return 0
+
+        # Single streaming pass over the unindexed tail: timestamped lines
+        # drive a small state machine and the raw JSON lines between them are
+        # accumulated as-is, so the whole file is never held in memory
+        added = 0
         current_file = None
-        for i in range(len(lines)):
-            line = lines[i].rstrip('\n')
-            if line.startswith('20'):
-                parts = line.split(' - ', 3)
-                if len(parts) < 3:
-                    continue
-                message = parts[2]
-                if "Processing file: " in message:
-                    current_file = message.split("Processing file: ")[1].strip()
-                elif "Model output:" in message and current_file is not None:
-                    # Collect JSON lines
-                    json_lines = []
-                    j = i + 1
-                    while j < len(lines) and not lines[j].startswith('20'):
-                        json_lines.append(lines[j].rstrip('\n'))
-                        j += 1
-                    json_str = '\n'.join(json_lines)
-                    try:
-                        data = json.loads(json_str)
-                        title = data.get('title', '')
-                        author = data.get('author', '')
-                        # Store in cache even if empty to avoid reprocessing
-                        self.metadata_cache[current_file] = (title, author)
-                    except json.JSONDecodeError:
-                        pass
-                    current_file = None  # Reset after processing
+        json_lines = None  # non-None while collecting a model output block
+        with open(log_file, 'rb') as raw:
+            raw.seek(last_indexed)
+            f = io.TextIOWrapper(raw, encoding='utf-8', errors='replace')
+            for line in f:
+                if line.startswith('20'):
+                    if json_lines is not None:
+                        added += self._store_migrated_entry(current_file, ''.join(json_lines))
+                        current_file = None
+                        json_lines = None
+                    parts = line.split(' - ', 3)
+                    if len(parts) < 3:
+                        continue
+                    message = parts[2]
+                    if "Processing file: " in message:
+                        current_file = message.split("Processing file: ")[1].strip()
+                    elif "Model output:" in message and current_file is not None:
+                        json_lines = []
+                elif json_lines is not None:
+                    json_lines.append(line)
+            if json_lines is not None:
+                added += self._store_migrated_entry(current_file, ''.join(json_lines))
+
+        try:
+            with open(idx_file, 'wb') as f:
+                array.array('q', [log_size]).tofile(f)
+        except OSError as e:
+            self.logger.error(f"Failed to write log index {idx_file}: {str(e)}")
+
+        if added:
+            self._persist_cache()
+        return added
+
+    def _store_migrated_entry(self, filename: str, json_str: str) -> int:
+        """Cache one logged model-output block; returns the entries added."""
+        try:
+            data = _json_loads(json_str)
+            title = data.get('title', '')
+            author = data.get('author', '')
+        except (json.JSONDecodeError, AttributeError):
+            return 0
+        # Store even if empty to avoid reprocessing, but never clobber an
+        # existing sidecar entry
+        cache_key = self.sanitize_filename(filename)
+        with self._cache_lock:
+            if cache_key not in self.metadata_cache:
+                self.metadata_cache[cache_key] = (title, author)
+                return 1
+        return 0
 
     def query_deepseek(self, prompt: str) -> str:
         try:
+            # Serve identical prompts from the on-disk cache before paying
+            # for a remote round-trip
+            prompt_key = hashlib.sha256(prompt.encode()).digest()
+            with self._prompt_cache_lock:
+                row = self._prompt_cache.execute(
+                    'SELECT v FROM c WHERE k = ?', (prompt_key,)).fetchone()
+            if row is not None:
+                self.logger.info("Returning cached response for previously seen prompt")
+                return row[0]
+
             self.logger.info("=== Starting API Query ===")
             self.logger.info(f"Prompt sent to model:\n{prompt}")
             
@@ -81,16 +330,9 @@ class BibliographyOrganizer:
                 "model": "deepseek/deepseek-r1-distill-llama-70b:free",
                 "messages": [{"role": "user", "content": prompt}]
             }
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "https://bibliography-organizer.local",
-                "X-Title": "Bibliography Organizer"
-            }
-            
-            response = requests.post(
+
+            response = self.session.post(
                 self.api_url,
-                headers=headers,
                 json=payload,
                 timeout=(15, 30)
             )
@@ -114,45 +356,15 @@ class BibliographyOrganizer:
                 result = result.strip()
                 
                 # Enhanced JSON extraction
+                potential_jsons = []
                 try:
                     # Remove Python tags and headers if present
                     result = result.replace('<|python_tag|>', '')
                     result = result.replace('<|start_header_id|>assistant<|end_header_id|>', '')
                     
-                    # Find all potential JSON objects in the text
-                    potential_jsons = []
-                    start = 0
-                    while True:
-                        try:
-                            # Find the next JSON-like structure
-                            start = result.find('{', start)
-                            if start == -1:
-                                break
-                            
-                            # Track nested braces
-                            brace_count = 1
-                            pos = start + 1
-                            
-                            while brace_count > 0 and pos < len(result):
-                                if result[pos] == '{':
-                                    brace_count += 1
-                                elif result[pos] == '}':
-                                    brace_count -= 1
-                                pos += 1
-                            
-                            if brace_count == 0:
-                                potential_json = result[start:pos]
-                                try:
-                                    # Validate if it's valid JSON
-                                    json.loads(potential_json)
-                                    potential_jsons.append(potential_json)
-                                except json.JSONDecodeError:
-                                    pass
-                            
-                            start = pos
-                        except ValueError:
-                            break
-                    
+                    # Find all valid JSON objects in the text
+                    potential_jsons = [raw for _, raw in _iter_json_objects(result)]
+
                     # Use the longest valid JSON found (usually the most complete)
                     if potential_jsons:
                         result = max(potential_jsons, key=len)
@@ -171,6 +383,13 @@ class BibliographyOrganizer:
                 result = result.strip()
                 
                 self.logger.info(f"Model output:\n{result}")
+                # Only cache responses that contained valid JSON; empty or
+                # prose replies (refusals, chatter) stay retryable
+                if result and potential_jsons:
+                    with self._prompt_cache_lock:
+                        self._prompt_cache.execute(
+                            'INSERT OR REPLACE INTO c VALUES (?, ?)', (prompt_key, result))
+                        self._prompt_cache.commit()
                 return result
                 
             except json.JSONDecodeError:
@@ -186,20 +405,43 @@ class BibliographyOrganizer:
             return ""
 
     def sanitize_filename(self, filename: str) -> str:
-        # Remove special characters and convert spaces to underscores
-        sanitized = filename.replace(' ', '_')
-        # Keep only alphanumeric characters, dots, underscores and hyphens
-        sanitized = ''.join(c for c in sanitized if c.isalnum() or c in '._-')
-        return sanitized
+        # Strip diacritics down to ASCII, then convert spaces to underscores
+        # and keep only alphanumeric characters, dots, underscores and hyphens
+        ascii_name = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
+        sanitized = ascii_name.translate(self._SANITIZE_TABLE)
+        if sum(c.isalnum() for c in sanitized) == sum(c.isalnum() for c in filename):
+            return sanitized
+        # ASCII folding erases whole non-Latin scripts (CJK, Cyrillic, ...),
+        # which would collapse distinct filenames into one cache key; keep
+        # the original characters with the Unicode-aware filter instead
+        kept = filename.replace(' ', '_')
+        return ''.join(c for c in kept if c.isalnum() or c in '._-')
+
+    def _metadata_from_filename(self, filename: str) -> Optional[Tuple[str, str]]:
+        """Parse (title, author) directly from a conventionally named file.
+
+        Returns None when no pattern matches, in which case the caller falls
+        back to the model.
+        """
+        stem = Path(filename).stem
+        for pattern in self._FILENAME_PATTERNS:
+            match = pattern.match(stem)
+            if match:
+                title = match.group('title').replace('_', ' ').strip()
+                return title, match.group('author')
+        return None
 
     def extract_document_info(self, file_path: str) -> Tuple[str, str]:
         self.logger.info(f"Extracting document info from: {file_path}")
         filename = Path(file_path).name
         sanitized_filename = self.sanitize_filename(filename)
 
-        # Check cache first
-        if filename in self.metadata_cache:
-            title, author = self.metadata_cache[filename]
+        # Check cache first, keyed by sanitized filename so trivially
+        # different spellings of the same name share one entry
+        with self._cache_lock:
+            cached = self.metadata_cache.get(sanitized_filename)
+        if cached is not None:
+            title, author = cached
             if title and author:
                 self.logger.info(f"Using cached metadata - Title: {title}, Authors: {author}")
                 return title, author
@@ -207,15 +449,27 @@ class BibliographyOrganizer:
                 self.logger.info(f"Cached metadata not found for {filename}")
                 return '', ''
 
+        # Cheap regex pre-pass: conventionally named files skip the API
+        parsed = self._metadata_from_filename(filename)
+        if parsed is not None:
+            title, author = parsed
+            with self._cache_lock:
+                self.metadata_cache[sanitized_filename] = (title, author)
+            self._persist_cache()
+            self.logger.info(f"Parsed metadata from filename pattern - Title: {title}, Authors: {author}")
+            return title, author
+
         # Proceed with API query if not in cache
-        prompt = f"I will give you a filename of a file which is an academic work. I want you to use the data in the filename to look in the web for the full title of the academic work and its author's surname. Also, find out if it is an article or a book. I want you to return ONLY a JSON object with the title (the key will be named title) and author's surname (the key will be named author) obtained, and also with the document type (article or book, the key will be named document_type). The response must contain ONLY the JSON, no other text. Do not give me responses with code blocks! Use empty strings if you can't determine both values clearly. {sanitized_filename}"
+        prompt = self._METADATA_PROMPT_PREFIX + sanitized_filename
         response = self.query_deepseek(prompt)
         try:
-            info = json.loads(response)
+            info = _json_loads(response)
             title = info.get('title', '')
             author = info.get('author', '')
             # Update cache even if empty
-            self.metadata_cache[filename] = (title, author)
+            with self._cache_lock:
+                self.metadata_cache[sanitized_filename] = (title, author)
+            self._persist_cache()
             if title and author:
                 self.logger.info(f"Successfully extracted document info - Title: {title}, Authors: {author}")
                 return title, author
@@ -226,50 +480,145 @@ class BibliographyOrganizer:
             self.logger.error(f"Failed to parse filename info response for: {file_path}")
             return '', ''
 
+    def _list_pdfs(self, folder: str) -> List[Path]:
+        """List the PDF files in a folder, matching extensions case-insensitively.
+
+        The result is cached per folder so repeated scans within one run
+        (e.g. a resume attempt followed by a fresh organization) are free.
+        """
+        if folder not in self._pdf_cache:
+            self._pdf_cache[folder] = [p for p in Path(folder).iterdir()
+                                       if p.is_file() and p.suffix.lower() == '.pdf']
+        return self._pdf_cache[folder]
+
+    def extract_document_info_batch(self, filenames: List[str]) -> Dict[str, Tuple[str, str]]:
+        """Extract metadata for several filenames with a single API call.
+
+        Returns a mapping of original filename -> (title, author); filenames
+        the model could not resolve map to ('', '').
+        """
+        numbered = '\n'.join(f"{i}: {self.sanitize_filename(name)}"
+                             for i, name in enumerate(filenames, 1))
+        prompt = self._BATCH_PROMPT_PREFIX + numbered
+        response = self.query_deepseek(prompt)
+
+        results = {name: ('', '') for name in filenames}
+        answered = {}
+        try:
+            data = _json_loads(response)
+            for entry in data.get('results', []):
+                entry_id = entry.get('id')
+                if isinstance(entry_id, int) and 1 <= entry_id <= len(filenames):
+                    filename = filenames[entry_id - 1]
+                    value = (entry.get('title', ''), entry.get('author', ''))
+                    results[filename] = value
+                    answered[self.sanitize_filename(filename)] = value
+        except (json.JSONDecodeError, AttributeError):
+            self.logger.error(f"Failed to parse batch metadata response for: {filenames}")
+            return results
+
+        # Cache only the files the model actually answered for, even with
+        # empty values; files missing from a failed or partial response stay
+        # retryable on the next run
+        if answered:
+            with self._cache_lock:
+                self.metadata_cache.update(answered)
+            self._persist_cache()
+        for filename, (title, author) in results.items():
+            if title and author:
+                self.logger.info(f"Successfully extracted document info - Title: {title}, Authors: {author}")
+            else:
+                self.logger.warning(f"Could not extract title and authors from filename: {filename}")
+        return results
+
     def organize_files(self, input_folder: str):
         print("\n=== Starting Bibliography Organization Process ===")
         self.logger.info(f"Starting file organization in folder: {input_folder}")
         documents_info = {}
 
         # Process each file
-        pdf_files = [f for f in Path(input_folder).glob('*.pdf')]
+        pdf_files = self._list_pdfs(input_folder)
         total_files = len(pdf_files)
         print(f"\nFound {total_files} PDF files to process")
 
-        for idx, file_path in enumerate(pdf_files, 1):
-            print(f"\nProcessing file {idx}/{total_files}: {file_path.name}")
-            self.logger.info(f"Processing file: {file_path.name}")
-            title, author = self.extract_document_info(str(file_path))
-            if title and author:
-                print(f"  ✓ Extracted metadata - Title: {title}, Authors: {author}")
-                documents_info[str(file_path)] = {
-                    'title': title,
-                    'author': author,
-                    'file_type': 'Book'
-                }
-            else:
-                print("  ✗ Could not extract title/authors from filename")
-                self.logger.warning(f"Skipping file due to missing title/authors: {file_path.name}")
+        # Resolve cache hits up front, then batch the remaining filenames so
+        # each API call covers up to batch_size files instead of one. The
+        # batches themselves still fan out across the thread pool.
+        metadata = {}
+        uncached = []
+        pattern_hits = 0
+        for file_path in pdf_files:
+            cache_key = self.sanitize_filename(file_path.name)
+            with self._cache_lock:
+                cached = self.metadata_cache.get(cache_key)
+            if cached is not None:
+                metadata[file_path] = cached
+                continue
+            # Conventionally named files are parsed locally, no API needed
+            parsed = self._metadata_from_filename(file_path.name)
+            if parsed is not None:
+                metadata[file_path] = parsed
+                with self._cache_lock:
+                    self.metadata_cache[cache_key] = parsed
+                pattern_hits += 1
+                continue
+            uncached.append(file_path)
+        if pattern_hits:
+            self._persist_cache()
+
+        batches = [uncached[i:i + self.batch_size]
+                   for i in range(0, len(uncached), self.batch_size)]
+        # The plan prompt only depends on the collected titles, so it is
+        # submitted to the same pool the moment the last batch resolves; the
+        # per-file status output below then overlaps the plan round-trip
+        future_plan = None
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.extract_document_info_batch,
+                                       [p.name for p in batch]): batch
+                       for batch in batches}
+            for future in as_completed(futures):
+                batch_result = future.result()
+                for file_path in futures[future]:
+                    metadata[file_path] = batch_result[file_path.name]
+
+            for file_path in pdf_files:
+                title, author = metadata[file_path]
+                if title and author:
+                    documents_info[str(file_path)] = {
+                        'title': title,
+                        'author': author,
+                        'file_type': 'Book'
+                    }
+
+            if documents_info:
+                print("\n=== Creating Organization Plan ===")
+                works_list = [f"{info['title']} by {info['author']}" for info in documents_info.values()]
+                works_text = '\n'.join(works_list)
+
+                prompt = self._PLAN_PROMPT_PREFIX + works_text
+
+                future_plan = executor.submit(self.query_deepseek, prompt)
+
+            # Report per-file results while the plan request is in flight
+            for idx, file_path in enumerate(pdf_files, 1):
+                print(f"\nProcessing file {idx}/{total_files}: {file_path.name}")
+                self.logger.info(f"Processing file: {file_path.name}")
+                title, author = metadata[file_path]
+                if title and author:
+                    print(f"  ✓ Extracted metadata - Title: {title}, Authors: {author}")
+                else:
+                    print("  ✗ Could not extract title/authors from filename")
+                    self.logger.warning(f"Skipping file due to missing title/authors: {file_path.name}")
 
         if not documents_info:
             print("\n✗ No valid documents to process. Stopping organization.")
             self.logger.error("No documents with valid metadata found. Stopping organization process.")
             return
 
-        print("\n=== Creating Organization Plan ===")
-        works_list = [f"{info['title']} by {info['author']}" for info in documents_info.values()]
-        works_text = '\n'.join(works_list)
-        
-        prompt = f"""I will give you a list of academic works. Based on it, create a simple organization scheme that best fits these works.
-
-Return ONLY a JSON object with a single property 'placements' that maps each work title to its designated folder path. The folder paths should use forward slashes and can be nested (e.g. 'Science/Physics').
+        response = future_plan.result()
 
-Works to organize:\n{works_text}"""
-
-        response = self.query_deepseek(prompt)
-        
         try:
-            organization_plan = json.loads(response)
+            organization_plan = _json_loads(response)
             if not isinstance(organization_plan, dict) or 'placements' not in organization_plan:
                 print("✗ Failed to generate valid organization plan. Stopping organization.")
                 self.logger.error("Invalid organization plan format received")
@@ -281,23 +630,19 @@ Works to organize:\n{works_text}"""
             # Extract unique folder paths from placements
             unique_folders = set(organization_plan['placements'].values())
             
-            # Create folders with support for nested structure
+            # Create folders with support for nested structure; one mkdir
+            # call per leaf creates the whole chain
             for folder_path in unique_folders:
-                folder_path_parts = folder_path.split('/')
-                current_path = Path(input_folder)
-                
-                # Create each level of the folder structure
-                for part in folder_path_parts:
-                    part = self.sanitize_filename(part)
-                    current_path = current_path / part
-                    try:
-                        current_path.mkdir(exist_ok=True)
-                        folder_paths[folder_path] = current_path
-                        print(f"  ✓ Created folder: {folder_path}")
-                        self.logger.info(f"Created folder: {current_path}")
-                    except Exception as e:
-                        print(f"  ✗ Error creating folder {part}: {str(e)}")
-                        self.logger.error(f"Error creating folder {current_path}: {str(e)}")
+                target_path = Path(input_folder).joinpath(
+                    *[self.sanitize_filename(part) for part in folder_path.split('/')])
+                try:
+                    target_path.mkdir(parents=True, exist_ok=True)
+                    folder_paths[folder_path] = target_path
+                    print(f"  ✓ Created folder: {folder_path}")
+                    self.logger.info(f"Created folder: {target_path}")
+                except Exception as e:
+                    print(f"  ✗ Error creating folder {folder_path}: {str(e)}")
+                    self.logger.error(f"Error creating folder {target_path}: {str(e)}")
 
             if not folder_paths:
                 print("✗ Failed to create any folders. Stopping organization.")
@@ -315,14 +660,21 @@ Works to organize:\n{works_text}"""
                 target_folder_path = organization_plan['placements'].get(work_key)
                 
                 if target_folder_path and target_folder_path in folder_paths:
-                    new_filename = f"{info['author'].split(',')[0]}-{info['title']}"
-                    new_filename = self.sanitize_filename(new_filename)
-                    new_filename = f"{new_filename}{file_path.suffix}"
-
+                    # Build the stem in one string and sanitize it in one pass
+                    new_filename = self.sanitize_filename(
+                        f"{info['author'].partition(',')[0]}-{info['title']}") + file_path.suffix
                     destination = folder_paths[target_folder_path] / new_filename
                     try:
-                        shutil.move(file_path, destination)
-                        print(f"  ✓ Moved '{title}' to folder: {target_folder_path}")
+                        if file_path.resolve() == destination.resolve():
+                            self.logger.info(f"File already at destination: {destination}")
+                            continue
+                        # Destination is a subfolder of the input folder, so a
+                        # plain rename works; fall back for exotic mounts
+                        try:
+                            os.replace(file_path, destination)
+                        except OSError:
+                            shutil.move(file_path, destination)
+                        print(f"  ✓ Moved '{info['title']}' to folder: {target_folder_path}")
                         print(f"  ✓ New filename: {new_filename}")
                         organized_count += 1
                         self.logger.info(f"Successfully moved and renamed file to: {destination}")
@@ -349,49 +701,58 @@ Works to organize:\n{works_text}"""
         self.logger.info("Organization complete!")
 
     def find_last_placement_json(self) -> str:
-        """Search through the log file for the most recent valid placement JSON."""
+        """Search through the log file for the most recent valid placement JSON.
+
+        Scans the file backwards in 64 KB chunks so the answer is found
+        without loading a potentially huge log into memory. Each iteration
+        only searches the newly read bytes plus a small boundary overlap, so
+        a log containing no plan at all still costs a single pass; the older
+        part of the buffer is kept just so candidate objects spanning chunk
+        boundaries can be decoded in full.
+        """
+        decoder = json.JSONDecoder()
+        key = b'"placements"'
+        # A plan object's opening brace sits at most a few bytes before its
+        # 'placements' key the way plans are prompted; 4 KB is generous slack
+        brace_window = 4096
         try:
-            with open('bibliography_organizer.log', 'r', encoding='utf-8') as f:
-                log_content = f.read()
-            
-            # Find all potential JSON objects in the text
-            potential_jsons = []
-            start = 0
-            while True:
-                try:
-                    # Find the next JSON-like structure
-                    start = log_content.find('{', start)
-                    if start == -1:
-                        break
-                    
-                    # Track nested braces
-                    brace_count = 1
-                    pos = start + 1
-                    
-                    while brace_count > 0 and pos < len(log_content):
-                        if log_content[pos] == '{':
-                            brace_count += 1
-                        elif log_content[pos] == '}':
-                            brace_count -= 1
-                        pos += 1
-                    
-                    if brace_count == 0:
-                        potential_json = log_content[start:pos]
-                        try:
-                            # Validate if it's valid JSON with placements
-                            parsed = json.loads(potential_json)
-                            if isinstance(parsed, dict) and 'placements' in parsed:
-                                potential_jsons.append(potential_json)
-                        except json.JSONDecodeError:
-                            pass
-                    
-                    start = pos
-                except ValueError:
-                    break
-            
-            # Return the last valid placement JSON found
-            return potential_jsons[-1] if potential_jsons else ''
-            
+            with open('bibliography_organizer.log', 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                chunk_size = 1 << 16
+                buf = b''
+                pos = size
+
+                while pos > 0:
+                    read_size = min(chunk_size, pos)
+                    pos -= read_size
+                    f.seek(pos)
+                    buf = f.read(read_size) + buf
+
+                    # Bytes past this offset were searched in earlier
+                    # iterations; the overlap covers a key or opening brace
+                    # that was cut off at the previous buffer start
+                    search_end = min(len(buf), read_size + brace_window + len(key))
+
+                    # Try the newest 'placements' occurrence first, decoding
+                    # from the nearest preceding opening brace
+                    key_pos = buf.rfind(key, 0, search_end)
+                    while key_pos != -1:
+                        brace_floor = max(0, key_pos - brace_window)
+                        brace_pos = buf.rfind(b'{', brace_floor, key_pos + 1)
+                        while brace_pos != -1:
+                            text = buf[brace_pos:].decode('utf-8', errors='replace')
+                            try:
+                                obj, end = decoder.raw_decode(text)
+                                if isinstance(obj, dict) and 'placements' in obj:
+                                    return text[:end]
+                            except json.JSONDecodeError:
+                                pass
+                            brace_pos = buf.rfind(b'{', brace_floor, brace_pos)
+                        key_pos = buf.rfind(key, 0, key_pos)
+
+            return ''
+
         except Exception as e:
             self.logger.error(f"Error searching for placement JSON in log: {str(e)}")
             return ''
@@ -401,7 +762,7 @@ Works to organize:\n{works_text}"""
         self.logger.info("Resuming organization with provided placements JSON")
 
         try:
-            organization_plan = json.loads(placements_json)
+            organization_plan = _json_loads(placements_json)
             if not isinstance(organization_plan, dict) or 'placements' not in organization_plan:
                 print("✗ Invalid organization plan format. Stopping organization.")
                 self.logger.error("Invalid organization plan format in provided JSON")
@@ -413,23 +774,19 @@ Works to organize:\n{works_text}"""
             # Extract unique folder paths from placements
             unique_folders = set(organization_plan['placements'].values())
             
-            # Create folders with support for nested structure
+            # Create folders with support for nested structure; one mkdir
+            # call per leaf creates the whole chain
             for folder_path in unique_folders:
-                folder_path_parts = folder_path.split('/')
-                current_path = Path(input_folder)
-                
-                # Create each level of the folder structure
-                for part in folder_path_parts:
-                    part = self.sanitize_filename(part)
-                    current_path = current_path / part
-                    try:
-                        current_path.mkdir(exist_ok=True)
-                        folder_paths[folder_path] = current_path
-                        print(f"  ✓ Created folder: {folder_path}")
-                        self.logger.info(f"Created folder: {current_path}")
-                    except Exception as e:
-                        print(f"  ✗ Error creating folder {part}: {str(e)}")
-                        self.logger.error(f"Error creating folder {current_path}: {str(e)}")
+                target_path = Path(input_folder).joinpath(
+                    *[self.sanitize_filename(part) for part in folder_path.split('/')])
+                try:
+                    target_path.mkdir(parents=True, exist_ok=True)
+                    folder_paths[folder_path] = target_path
+                    print(f"  ✓ Created folder: {folder_path}")
+                    self.logger.info(f"Created folder: {target_path}")
+                except Exception as e:
+                    print(f"  ✗ Error creating folder {folder_path}: {str(e)}")
+                    self.logger.error(f"Error creating folder {target_path}: {str(e)}")
 
             if not folder_paths:
                 print("✗ Failed to create any folders. Stopping organization.")
@@ -440,12 +797,19 @@ Works to organize:\n{works_text}"""
             organized_count = 0
 
             # Process each PDF file in the input folder
-            pdf_files = list(Path(input_folder).glob('*.pdf'))
+            pdf_files = self._list_pdfs(input_folder)
             total_files = len(pdf_files)
             print(f"Found {total_files} PDF files to process")
 
+            # Fan out the metadata extraction like organize_files does; the
+            # moves themselves stay serial since they are cheap local renames.
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {executor.submit(self.extract_document_info, str(p)): p
+                           for p in pdf_files}
+                extracted = {futures[f]: f.result() for f in as_completed(futures)}
+
             for file_path in pdf_files:
-                title, author = self.extract_document_info(str(file_path))
+                title, author = extracted[file_path]
                 if not title or not author:
                     print(f"  ✗ Skipping {file_path.name} - Could not extract metadata")
                     continue
@@ -454,13 +818,20 @@ Works to organize:\n{works_text}"""
                 target_folder_path = organization_plan['placements'].get(work_key)
                 
                 if target_folder_path and target_folder_path in folder_paths:
-                    new_filename = f"{author.split(',')[0]}-{title}"
-                    new_filename = self.sanitize_filename(new_filename)
-                    new_filename = f"{new_filename}{file_path.suffix}"
-
+                    # Build the stem in one string and sanitize it in one pass
+                    new_filename = self.sanitize_filename(
+                        f"{author.partition(',')[0]}-{title}") + file_path.suffix
                     destination = folder_paths[target_folder_path] / new_filename
                     try:
-                        shutil.move(file_path, destination)
+                        if file_path.resolve() == destination.resolve():
+                            self.logger.info(f"File already at destination: {destination}")
+                            continue
+                        # Destination is a subfolder of the input folder, so a
+                        # plain rename works; fall back for exotic mounts
+                        try:
+                            os.replace(file_path, destination)
+                        except OSError:
+                            shutil.move(file_path, destination)
                         print(f"  ✓ Moved '{title}' to folder: {target_folder_path}")
                         print(f"  ✓ New filename: {new_filename}")
                         organized_count += 1
@@ -483,11 +854,18 @@ Works to organize:\n{works_text}"""
             return
 
 def main():
+    # One-shot upgrade path: rebuild the JSON cache from the legacy log file
+    if '--migrate-log' in sys.argv:
+        organizer = BibliographyOrganizer('')
+        added = organizer.migrate_cache_from_log()
+        print(f"Migrated {added} cached entries from bibliography_organizer.log")
+        return
+
     # Get API key from user
     api_key = input("Please enter your OpenRouter API key: ").strip()
     if not api_key:
         print("Error: API key is required!")
-        logging.error("No API key provided")
+        _setup_logger().error("No API key provided")
         return
         
     organizer = BibliographyOrganizer(api_key)
@@ -496,7 +874,7 @@ def main():
     input_folder = input("Enter the path to the folder containing your documents: ")
     if not os.path.exists(input_folder):
         print("Invalid folder path!")
-        logging.error(f"Invalid folder path provided: {input_folder}")
+        organizer.logger.error(f"Invalid folder path provided: {input_folder}")
         return
 
     # Ask if user wants to resume with existing placements